@@ -6,6 +6,7 @@ from db import User, Category, Game, Asset
 from flask import Flask
 from flask import request
 import users_dao
+import rate_limiter
 
 db_filename = "auth.db"
 app = Flask(__name__)
@@ -27,6 +28,10 @@ def success_response(data, code=200):
 def failure_response(message, code=404):
     return json.dumps({"success": False, "error": message}), code
 
+def rate_limited_response(retry_after):
+    body, code = failure_response("Too many requests, try again later.", 429)
+    return body, code, {"Retry-After": str(retry_after)}
+
 
 # -- USER ROUTES --------------------------------------------------
 
@@ -184,8 +189,17 @@ def register_account():
         return failure_response("Username cannot be empty")
     if name is None:
         return failure_response("Name cannot be empty")
-    
-    was_created, user = users_dao.create_user(email, password, username, name)
+
+    # Take a hashing slot first so shed requests don't spend rate limit tokens
+    if not rate_limiter.acquire_hashing_slot():
+        return rate_limited_response(rate_limiter.HASHING_RETRY_AFTER)
+    try:
+        allowed, retry_after = rate_limiter.check_auth_request(request.remote_addr, email)
+        if not allowed:
+            return rate_limited_response(retry_after)
+        was_created, user = users_dao.create_user(email, password, username, name)
+    finally:
+        rate_limiter.release_hashing_slot()
 
     if not was_created:
         return json.dumps({"error": "User already exists."})
@@ -207,8 +221,17 @@ def login():
 
     if email is None or password is None:
         return json.dumps({"error": "Invalid email or password"})
-    
-    was_successful, user = users_dao.verify_credentials(email, password)
+
+    # Take a hashing slot first so shed requests don't spend rate limit tokens
+    if not rate_limiter.acquire_hashing_slot():
+        return rate_limited_response(rate_limiter.HASHING_RETRY_AFTER)
+    try:
+        allowed, retry_after = rate_limiter.check_auth_request(request.remote_addr, email)
+        if not allowed:
+            return rate_limited_response(retry_after)
+        was_successful, user = users_dao.verify_credentials(email, password)
+    finally:
+        rate_limiter.release_hashing_slot()
 
     if not was_successful:
         return json.dumps({"error": "Incorrect email or password"})
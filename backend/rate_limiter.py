@@ -0,0 +1,85 @@
+import math
+from collections import OrderedDict
+import threading
+import time
+
+# Per-client (IP) limits on the auth endpoints: burst size and tokens per second
+CLIENT_BURST = 10
+CLIENT_REFILL_RATE = 10 / 60.0
+
+# Per-email limits, so one account cannot be hammered from many addresses
+EMAIL_BURST = 5
+EMAIL_REFILL_RATE = 5 / 300.0
+
+# Max number of bcrypt operations running at once across all worker threads
+MAX_CONCURRENT_HASHES = 2
+HASHING_RETRY_AFTER = 1
+
+# Hard cap on tracked keys; the least recently used bucket is evicted first
+MAX_TRACKED_KEYS = 10000
+
+
+class TokenBucket(object):
+    def __init__(self, capacity, refill_rate, now):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = float(capacity)
+        self.last_refill = now
+
+    def _refill(self, now):
+        elapsed = max(0, now - self.last_refill)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.last_refill = now
+
+    # Returns (allowed, seconds to wait before a token is available)
+    def consume(self, now):
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0
+        return False, int(math.ceil((1 - self.tokens) / self.refill_rate))
+
+
+class RateLimiter(object):
+    def __init__(self, capacity, refill_rate, max_keys=MAX_TRACKED_KEYS):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, now=None):
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+                bucket = TokenBucket(self.capacity, self.refill_rate, now)
+                self._buckets[key] = bucket
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.consume(now)
+
+
+client_limiter = RateLimiter(CLIENT_BURST, CLIENT_REFILL_RATE)
+email_limiter = RateLimiter(EMAIL_BURST, EMAIL_REFILL_RATE)
+hashing_slots = threading.BoundedSemaphore(MAX_CONCURRENT_HASHES)
+
+
+# Returns (allowed, retry_after) for an auth request from client for email
+def check_auth_request(client, email):
+    allowed, retry_after = client_limiter.hit(client)
+    if not allowed:
+        return False, retry_after
+    return email_limiter.hit(str(email).strip().lower())
+
+
+# Non-blocking: if every hashing slot is busy the caller should shed the request
+def acquire_hashing_slot():
+    return hashing_slots.acquire(blocking=False)
+
+
+def release_hashing_slot():
+    hashing_slots.release()